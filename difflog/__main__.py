@@ -2,6 +2,7 @@ import argparse
 from pathlib import Path
 
 from difflog.diff import diff
+from difflog.module_member import _parse_file
 
 
 def main(args: list[str] | None = None):
@@ -10,7 +11,13 @@ def main(args: list[str] | None = None):
     parser.add_argument("new_file", type=Path, help="The new Python file to compare.")
     args_ = parser.parse_args(args=args)
 
-    for change in sorted(diff(args_.old_file.read_text(), args_.new_file.read_text())):
+    old_module = _parse_file(args_.old_file)
+    new_module = _parse_file(args_.new_file)
+
+    for change in sorted(
+        diff(old_module, new_module),
+        key=lambda change: (change.path, change.name, type(change).__name__),
+    ):
         print(change.describe())
 
 
@@ -3,13 +3,24 @@ The diffing mechanism for API members.
 """
 
 import ast
+import difflib
 import logging
-from dataclasses import dataclass, field
-from typing import Any, Literal
-
-from deepdiff import DeepDiff, Delta
-
-from difflog.module_member import ModuleMember, ApiMember
+from dataclasses import dataclass, field, fields
+from functools import partial
+from typing import Any, Callable, ClassVar, Iterator, Literal, Mapping
+
+from difflog.module_member import (
+    ApiMember,
+    ArgumentKeywordOnly,
+    ArgumentPositionalOnly,
+    ArgumentPositionalOrKeyword,
+    ArgumentVarKeyword,
+    ArgumentVarPositional,
+    AttributeMember,
+    ClassMember,
+    FunctionMember,
+    ModuleMember,
+)
 
 __all__ = (
     "diff",
@@ -27,7 +38,9 @@ __all__ = (
 )
 
 
-@dataclass(frozen=True, order=True)
+# On Python 3.10, `slots=True` also redeclares inherited fields as slots in each
+# subclass (fixed in 3.11), so changes there are bigger than they need to be
+@dataclass(frozen=True, slots=True)
 class ApiChange:
     """Base class for API changes."""
 
@@ -35,39 +48,58 @@ class ApiChange:
     name: str
 
     _diff_symbol: Literal["+", "-", "#", "!"] = field(init=False, default="#")
+    _description: ClassVar[str]
+
+    # Changes of any type order by where they are, so mixed lists can be sorted
+    def __lt__(self, other: "ApiChange") -> bool:
+        if not isinstance(other, ApiChange):
+            return NotImplemented
+        return (self.path, self.name) < (other.path, other.name)
+
+    def __le__(self, other: "ApiChange") -> bool:
+        if not isinstance(other, ApiChange):
+            return NotImplemented
+        return (self.path, self.name) <= (other.path, other.name)
+
+    def __gt__(self, other: "ApiChange") -> bool:
+        if not isinstance(other, ApiChange):
+            return NotImplemented
+        return (self.path, self.name) > (other.path, other.name)
+
+    def __ge__(self, other: "ApiChange") -> bool:
+        if not isinstance(other, ApiChange):
+            return NotImplemented
+        return (self.path, self.name) >= (other.path, other.name)
 
     def _prefix(self, message: str) -> str:
         return f"[{self.path}] {message}" if self.path else message
 
     def describe(self) -> str:
-        raise NotImplementedError
+        values = {f.name: getattr(self, f.name) for f in fields(self)}
+        return self._prefix(self._description.format_map(values))
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, slots=True)
 class Added(ApiChange):
     """Added API member."""
 
     type_name: str
 
     _diff_symbol: Literal["+", "-", "#", "!"] = field(init=False, default="+")
-
-    def describe(self) -> str:
-        return self._prefix(f"Added {self.type_name} `{self.name}`")
+    _description: ClassVar[str] = "Added {type_name} `{name}`"
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, slots=True)
 class Removed(ApiChange):
     """Removed API member."""
 
     type_name: str
 
     _diff_symbol: Literal["+", "-", "#", "!"] = field(init=False, default="-")
-
-    def describe(self) -> str:
-        return self._prefix(f"Removed {self.type_name} `{self.name}`")
+    _description: ClassVar[str] = "Removed {type_name} `{name}`"
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, slots=True)
 class TypeChanged(ApiChange):
     """API member's type changed."""
 
@@ -75,14 +107,12 @@ class TypeChanged(ApiChange):
     to_type: str
 
     _diff_symbol: Literal["+", "-", "#", "!"] = field(init=False, default="!")
-
-    def describe(self) -> str:
-        return self._prefix(
-            f"Changed type of `{self.name}` from {self.from_type} to {self.to_type}"
-        )
+    _description: ClassVar[str] = (
+        "Changed type of `{name}` from {from_type} to {to_type}"
+    )
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, slots=True)
 class Modified(ApiChange):
     """Some property of the API member changed."""
 
@@ -92,14 +122,12 @@ class Modified(ApiChange):
     to_value: Any
 
     _diff_symbol: Literal["+", "-", "#", "!"] = field(init=False, default="!")
-
-    def describe(self) -> str:
-        return self._prefix(
-            f"Changed {self.type_name} `{self.name}` {self.prop} from {self.from_value} to {self.to_value}"
-        )
+    _description: ClassVar[str] = (
+        "Changed {type_name} `{name}` {prop} from {from_value} to {to_value}"
+    )
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, slots=True)
 class AddedClassBase(ApiChange):
     """Added base class to a class."""
 
@@ -107,14 +135,12 @@ class AddedClassBase(ApiChange):
     position: int
 
     _diff_symbol: Literal["+", "-", "#", "!"] = field(init=False, default="+")
-
-    def describe(self) -> str:
-        return self._prefix(
-            f"Added base class `{self.value}` to `{self.name}` at position {self.position}"
-        )
+    _description: ClassVar[str] = (
+        "Added base class `{value}` to `{name}` at position {position}"
+    )
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, slots=True)
 class RemovedClassBase(ApiChange):
     """Removed base class from a class."""
 
@@ -122,14 +148,12 @@ class RemovedClassBase(ApiChange):
     position: int
 
     _diff_symbol: Literal["+", "-", "#", "!"] = field(init=False, default="-")
-
-    def describe(self) -> str:
-        return self._prefix(
-            f"Removed base class `{self.value}` from `{self.name}` at position {self.position}"
-        )
+    _description: ClassVar[str] = (
+        "Removed base class `{value}` from `{name}` at position {position}"
+    )
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, slots=True)
 class ModifiedClassBase(ApiChange):
     """Modified base class of a class."""
 
@@ -138,14 +162,12 @@ class ModifiedClassBase(ApiChange):
     to_value: str
 
     _diff_symbol: Literal["+", "-", "#", "!"] = field(init=False, default="!")
+    _description: ClassVar[str] = (
+        "Modified base class of `{name}` at position {position} from `{from_value}` to `{to_value}`"
+    )
 
-    def describe(self) -> str:
-        return self._prefix(
-            f"Modified base class of `{self.name}` at position {self.position} from `{self.from_value}` to `{self.to_value}`"
-        )
 
-
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, slots=True)
 class AddedDecorator(ApiChange):
     """Added decorator to a function or class."""
 
@@ -154,14 +176,12 @@ class AddedDecorator(ApiChange):
     position: int
 
     _diff_symbol: Literal["+", "-", "#", "!"] = field(init=False, default="+")
+    _description: ClassVar[str] = (
+        "Added decorator `{value}` to {type_name} `{name}` at position {position}"
+    )
 
-    def describe(self) -> str:
-        return self._prefix(
-            f"Added decorator `{self.value}` to {self.type_name} `{self.name}` at position {self.position}"
-        )
 
-
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, slots=True)
 class RemovedDecorator(ApiChange):
     """Removed decorator from a function or class."""
 
@@ -170,14 +190,12 @@ class RemovedDecorator(ApiChange):
     position: int
 
     _diff_symbol: Literal["+", "-", "#", "!"] = field(init=False, default="-")
-
-    def describe(self) -> str:
-        return self._prefix(
-            f"Removed decorator `{self.value}` from {self.type_name} `{self.name}` at position {self.position}"
-        )
+    _description: ClassVar[str] = (
+        "Removed decorator `{value}` from {type_name} `{name}` at position {position}"
+    )
 
 
-@dataclass(frozen=True, order=True)
+@dataclass(frozen=True, slots=True)
 class ModifiedDecorator(ApiChange):
     """Modified decorator of a function or class."""
 
@@ -187,129 +205,170 @@ class ModifiedDecorator(ApiChange):
     to_value: str
 
     _diff_symbol: Literal["+", "-", "#", "!"] = field(init=False, default="!")
+    _description: ClassVar[str] = (
+        "Modified decorator of `{name}` at position {position} from `{from_value}` to `{to_value}`"
+    )
+
+
+def _diff_by_index(
+    old: list[str], new: list[str], old_start: int = 0, new_start: int = 0
+) -> list[tuple[int | None, int | None]]:
+    """Pair items of two lists position by position, returning changed index pairs."""
+    pairs: list[tuple[int | None, int | None]] = [
+        (old_start + i, new_start + i)
+        for i, (old_item, new_item) in enumerate(zip(old, new))
+        if old_item != new_item
+    ]
+    pairs.extend((old_start + i, None) for i in range(len(new), len(old)))
+    pairs.extend((None, new_start + i) for i in range(len(old), len(new)))
+    return pairs
+
+
+def _diff_sequence(
+    old: list[str], new: list[str]
+) -> list[tuple[int | None, int | None]]:
+    """
+    Align two lists, returning `(old_index, new_index)` pairs for every change.
+    An old index of `None` means the item was added, a new index of `None` means it was removed.
+    """
+    pairs: list[tuple[int | None, int | None]] = []
+    matcher = difflib.SequenceMatcher(a=old, b=new, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "replace":
+            pairs.extend(_diff_by_index(old[i1:i2], new[j1:j2], i1, j1))
+        elif tag == "delete":
+            pairs.extend((i, None) for i in range(i1, i2))
+        elif tag == "insert":
+            pairs.extend((None, j) for j in range(j1, j2))
+
+    # Position-wise comparison reads better for swaps and in-place edits
+    if len(pairs) > 1:
+        by_index = _diff_by_index(old, new)
+        if len(by_index) <= len(pairs):
+            return by_index
+    return pairs
+
+
+def _walk_props(
+    old: ApiMember, new: ApiMember, props: tuple[str, ...]
+) -> Iterator[ApiChange]:
+    for prop in props:
+        from_value = getattr(old, prop)
+        to_value = getattr(new, prop)
+        if from_value != to_value:
+            yield Modified(
+                old.parent_path,
+                old.leaf_name,
+                old.type_name,
+                prop,
+                from_value,
+                to_value,
+            )
 
-    def describe(self) -> str:
-        return self._prefix(
-            f"Modified decorator of `{self.name}` at position {self.position} from `{self.from_value}` to `{self.to_value}`"
-        )
 
+def _walk_bases(old: ClassMember, new: ClassMember) -> Iterator[ApiChange]:
+    path, name = old.parent_path, old.leaf_name
+    for i, j in _diff_sequence(old.bases, new.bases):
+        if j is None:
+            yield RemovedClassBase(path, name, old.bases[i], i)  # type: ignore
+        elif i is None:
+            yield AddedClassBase(path, name, new.bases[j], j)
+        else:
+            yield ModifiedClassBase(path, name, i, old.bases[i], new.bases[j])
+
+
+def _walk_decorators(
+    old: ClassMember | FunctionMember, new: ClassMember | FunctionMember
+) -> Iterator[ApiChange]:
+    path, name, type_name = old.parent_path, old.leaf_name, old.type_name
+    for i, j in _diff_sequence(old.decorators, new.decorators):
+        if j is None:
+            yield RemovedDecorator(path, name, type_name, old.decorators[i], i)  # type: ignore
+        elif i is None:
+            yield AddedDecorator(path, name, type_name, new.decorators[j], j)
+        else:
+            yield ModifiedDecorator(
+                path, name, type_name, i, old.decorators[i], new.decorators[j]
+            )
 
-def _get_member_from_path(module: ModuleMember, path: list[str]) -> ApiMember:
-    """Get the last member from a path (linked-list traversal)."""
-    last_member = module
-    for name in path:
-        module = module[name]
-        if isinstance(module, ApiMember):
-            last_member = module
-    return last_member
 
+def _walk_members(
+    old: Mapping[str, ApiMember], new: Mapping[str, ApiMember]
+) -> Iterator[ApiChange]:
+    for name, member in old.items():
+        new_member = new.get(name)
+        if new_member is None:
+            yield Removed(member.parent_path, member.leaf_name, member.type_name)
+        else:
+            yield from _walk(member, new_member)
 
-def diff(
-    old_module: ModuleMember | ast.Module | str,
-    new_module: ModuleMember | ast.Module | str,
-) -> list[ApiChange]:
-    """List the API changes between two modules."""
+    for name, member in new.items():
+        if name not in old:
+            yield Added(member.parent_path, member.leaf_name, member.type_name)
 
-    def _parse(input_module):
-        if isinstance(input_module, str):
-            return ModuleMember(node=ast.parse(input_module))
-        elif isinstance(input_module, ast.Module):
-            return ModuleMember(node=input_module)
-        return input_module
 
-    old_module = _parse(old_module)
-    new_module = _parse(new_module)
+def _walk_module(old: ModuleMember, new: ModuleMember) -> Iterator[ApiChange]:
+    yield from _walk_members(old.members, new.members)
 
-    output: list[ApiChange] = []
 
-    for row in Delta(
-        DeepDiff(old_module, new_module, exclude_regex_paths=r".*\.(?:node|path)"),
-        bidirectional=True,
-    ).to_flat_rows():
+def _walk_class(old: ClassMember, new: ClassMember) -> Iterator[ApiChange]:
+    yield from _walk_bases(old, new)
+    yield from _walk_decorators(old, new)
+    yield from _walk_members(old.members, new.members)
 
-        path = row.path
-        action = row.action
-        value = row.value
-        old_value = getattr(row, "old_value", None)
 
-        def make_path(obj):
-            return ".".join(obj.path[:-1])
+def _walk_function(old: FunctionMember, new: FunctionMember) -> Iterator[ApiChange]:
+    yield from _walk_props(old, new, ("returns", "is_async"))
+    yield from _walk_decorators(old, new)
+    yield from _walk_members(old.arguments, new.arguments)
 
-        def make_name(obj):
-            return obj.path[-1]
 
-        if action == "dictionary_item_added" and isinstance(value, ApiMember):
-            output.append(Added(make_path(value), make_name(value), value.type_name))
+_WALKERS: dict[type, Callable[[Any, Any], Iterator[ApiChange]]] = {
+    ModuleMember: _walk_module,
+    ClassMember: _walk_class,
+    FunctionMember: _walk_function,
+    AttributeMember: partial(_walk_props, props=("annotation", "value")),
+    ArgumentPositionalOnly: partial(
+        _walk_props, props=("annotation", "position", "default")
+    ),
+    ArgumentPositionalOrKeyword: partial(
+        _walk_props, props=("annotation", "position", "default")
+    ),
+    ArgumentKeywordOnly: partial(_walk_props, props=("annotation", "default")),
+    ArgumentVarPositional: partial(_walk_props, props=("annotation",)),
+    ArgumentVarKeyword: partial(_walk_props, props=("annotation",)),
+}
 
-        elif action == "dictionary_item_removed" and isinstance(value, ApiMember):
-            output.append(Removed(make_path(value), make_name(value), value.type_name))
 
-        elif action == "type_changes" and isinstance(value, ApiMember):
-            output.append(
-                TypeChanged(make_path(value), make_name(value), old_value.type_name, value.type_name)  # type: ignore
-            )
+def _walk(old: ApiMember, new: ApiMember) -> Iterator[ApiChange]:
+    """Yield the changes between two members found at the same path."""
+    # Members are mutable, so a hash can be stale, and two different members
+    # can collide. Matching hashes only skip the walk once equality confirms it
+    if old._hash == new._hash and old == new:
+        return
 
-        elif (
-            action == "values_changed"
-            and path[-1] == "members"
-            and isinstance(value, dict)
-        ):
-            for member in old_value.values():  # type: ignore
-                output.append(
-                    Removed(make_path(member), make_name(member), member.type_name)
-                )
-            for member in value.values():
-                output.append(
-                    Added(make_path(member), make_name(member), member.type_name)
-                )
-
-        elif action == "values_changed" and len(path) > 1:
-            obj = _get_member_from_path(old_module, path[:-1])
-            if path[-2] == "bases":
-                output.append(
-                    ModifiedClassBase(make_path(obj), make_name(obj), path[-1], old_value, value)  # type: ignore
-                )
-            elif path[-2] == "decorators":
-                output.append(
-                    ModifiedDecorator(make_path(obj), make_name(obj), obj.type_name, path[-1], old_value, value)  # type: ignore
-                )
-            else:
-                output.append(
-                    Modified(
-                        make_path(obj),
-                        make_name(obj),
-                        obj.type_name,
-                        path[-1],
-                        old_value,
-                        value,
-                    )
-                )
-
-        elif action == "iterable_item_added" and path[-2] == "decorators":
-            obj = _get_member_from_path(old_module, path[:-1])
-            output.append(
-                AddedDecorator(make_path(obj), make_name(obj), obj.type_name, value, path[-1])  # type: ignore
-            )
+    if type(old) is not type(new):
+        yield TypeChanged(new.parent_path, new.leaf_name, old.type_name, new.type_name)
+        return
 
-        elif action == "iterable_item_removed" and path[-2] == "decorators":
-            obj = _get_member_from_path(old_module, path[:-1])
-            output.append(
-                RemovedDecorator(make_path(obj), make_name(obj), obj.type_name, value, path[-1])  # type: ignore
-            )
+    walker = _WALKERS.get(type(old))
+    if walker is None:
+        logging.error(f"Unknown member type: {type(old).__name__}")
+        return
+    yield from walker(old, new)
 
-        elif action == "iterable_item_added" and path[-2] == "bases":
-            obj = _get_member_from_path(old_module, path[:-1])
-            output.append(
-                AddedClassBase(make_path(obj), make_name(obj), value, path[-1])  # type: ignore
-            )
 
-        elif action == "iterable_item_removed" and path[-2] == "bases":
-            obj = _get_member_from_path(old_module, path[:-1])
-            output.append(
-                RemovedClassBase(make_path(obj), make_name(obj), value, path[-1])  # type: ignore
-            )
+def _coerce(module: ModuleMember | ast.Module | str) -> ModuleMember:
+    if isinstance(module, str):
+        return ModuleMember(node=ast.parse(module))
+    if isinstance(module, ast.Module):
+        return ModuleMember(node=module)
+    return module
 
-        else:
-            logging.error(f"Unknown change: {row}")
 
-    return output
+def diff(
+    old_module: ModuleMember | ast.Module | str,
+    new_module: ModuleMember | ast.Module | str,
+) -> Iterator[ApiChange]:
+    """Iterate over the API changes between two modules."""
+    return _walk(_coerce(old_module), _coerce(new_module))
@@ -6,7 +6,7 @@ import argparse
 from fnmatch import fnmatch
 import pathlib
 import subprocess
-from typing import Callable
+from typing import Callable, Iterable, Mapping
 
 from difflog.diff import ApiChange, diff
 
@@ -20,20 +20,22 @@ def _check_in_git_repo():
         raise RuntimeError("not in git repo")
 
 
-def _diff_content(changes: list[ApiChange]) -> str:
+def _diff_content(changes: Iterable[ApiChange]) -> str:
     return "\n".join(
-        sorted([change._diff_symbol + " " + change.describe() for change in changes])
+        sorted(change._diff_symbol + " " + change.describe() for change in changes)
     )
 
 
-def md_report(changes: list[ApiChange] | dict[str, list[ApiChange]]) -> str:
+def md_report(
+    changes: Iterable[ApiChange] | Mapping[str, Iterable[ApiChange]],
+) -> str:
     """
     Generate a Markdown report of API changes.
     """
     total_content = ""
-    if isinstance(changes, dict):
-        for name, changes in sorted(changes.items(), key=lambda x: x[0]):
-            content = _diff_content(changes).strip()
+    if isinstance(changes, Mapping):
+        for name, file_changes in sorted(changes.items(), key=lambda x: x[0]):
+            content = _diff_content(file_changes).strip()
             if not content:
                 continue
             total_content += f"@@ {name} @@\n{content}\n\n"
@@ -76,17 +78,16 @@ def _git_changed_files(
 
 
 def _git_content_from_file(file_path: str, rev: str | None) -> str:
-    _check_in_git_repo()
-
+    # Callers check that we're in a git repo, once, before reading any files
     try:
         if rev is None:
             # If rev is not provided, read the file from disk
-            return pathlib.Path(file_path).read_text()
+            return pathlib.Path(file_path).read_text(encoding="utf-8")
         return subprocess.check_output(
             ["git", "show", f"{rev}:{file_path}"],
-            text=True,
+            encoding="utf-8",
             stderr=subprocess.DEVNULL,
-        ).strip()
+        )
     except (subprocess.CalledProcessError, FileNotFoundError):
         return ""
 
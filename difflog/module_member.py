@@ -1,7 +1,11 @@
-from abc import ABC, abstractmethod
 import ast
-from dataclasses import dataclass, field
-from typing import Callable
+from concurrent.futures import ProcessPoolExecutor
+import math
+import os
+from pathlib import Path
+import sys
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, ClassVar, Sequence
 
 __all__ = (
     "ApiMember",
@@ -16,252 +20,456 @@ __all__ = (
     "ArgumentPositionalOnly",
     "ArgumentPositionalOrKeyword",
     "ArgumentKeywordOnly",
+    "parse_modules",
 )
 
 
-@dataclass
+def _check_any_name(name: str) -> bool:
+    """The default name check, which includes every member."""
+    return True
+
+
+def _unparse(node: ast.AST | None) -> str:
+    """Unparse an expression to source, or an empty string if it's missing."""
+    if node is None:
+        return ""
+    # Bare names and simple literals make up most annotations, defaults, bases
+    # and decorators, and their source can be produced without `ast.unparse`.
+    # Strings are left to it, since its choice of quotes can differ from repr's
+    if type(node) is ast.Name:
+        return node.id
+    if type(node) is ast.Constant:
+        value = node.value
+        if value is None or type(value) in (bool, int):
+            return repr(value)
+        if type(value) is float and math.isfinite(value):
+            return repr(value)
+    return ast.unparse(node)
+
+
+# On Python 3.10, `slots=True` also redeclares inherited fields as slots in each
+# subclass (fixed in 3.11), so members there are bigger than they need to be
+@dataclass(slots=True)
 class ApiMember:
     """Base class for all API members."""
 
-    path: list[str]
+    path: list[str] = field(compare=False)
 
-    @property
-    @abstractmethod
-    def type_name(self) -> str:
-        raise NotImplementedError
+    parent_path: str = field(init=False, repr=False, compare=False)
+    leaf_name: str = field(init=False, repr=False, compare=False)
+    _hash: int = field(init=False, repr=False, compare=False)
+
+    type_name: ClassVar[str]
+    # The keys readable through `__getitem__`
+    _field_names: ClassVar[frozenset[str]]
 
     def __getitem__(self, key: str):
+        if key not in self._field_names:
+            raise KeyError(key)
         return getattr(self, key)
 
-
-@dataclass
-class _AstApiMember(ApiMember, ABC):
+    # Subclasses pass explicit arguments to super(), since the zero-argument
+    # form doesn't work in `slots=True` dataclasses before Python 3.14
+    def __post_init__(self):
+        # Siblings share one parent path string rather than a copy each
+        self.parent_path = sys.intern(".".join(self.path[:-1]))
+        self.leaf_name = self.path[-1] if self.path else ""
+        self._hash = hash(self._content())
+
+    def _content(self) -> tuple:
+        """The API-visible content of this member, hashed into `_hash`."""
+        return (type(self),)
+
+    def __setstate__(self, state: tuple[dict[str, Any] | None, dict[str, Any]]):
+        # Slotted objects pickle as (instance dict, slot values)
+        for values in state:
+            for name, value in (values or {}).items():
+                setattr(self, name, value)
+        # Hashes are only comparable within one process, so members unpickled
+        # from another one rehash (children are restored before their parent)
+        self._hash = hash(self._content())
+
+
+@dataclass(slots=True)
+class _AstApiMember(ApiMember):
     """Base class for API members parsed from an AST node."""
 
-    node: ast.AST = field(kw_only=True)
+    node: ast.AST = field(kw_only=True, compare=False, repr=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class AttributeMember(_AstApiMember):
     """Represents an attribute, parsed from `Assign` or `AnnAssign`."""
 
-    node: ast.Assign | ast.AnnAssign = field(kw_only=True)
+    node: ast.Assign | ast.AnnAssign = field(kw_only=True, compare=False, repr=False)
 
     annotation: str = field(init=False)
     value: str = field(init=False)
 
-    @property
-    def type_name(self) -> str:
-        return "attribute"
+    type_name: ClassVar[str] = "attribute"
 
     def __post_init__(self):
         if isinstance(self.node, ast.AnnAssign):
-            self.annotation = ast.unparse(self.node.annotation)
+            self.annotation = _unparse(self.node.annotation)
         else:
             self.annotation = ""
 
-        self.value = ast.unparse(self.node.value) if self.node.value else ""
+        self.value = _unparse(self.node.value)
+        super(AttributeMember, self).__post_init__()
 
+    def _content(self) -> tuple:
+        return (type(self), self.annotation, self.value)
 
-@dataclass
-class Argument(ApiMember, ABC):
+
+@dataclass(slots=True)
+class Argument(ApiMember):
     """Base class for function arguments."""
 
     annotation: str = ""
 
+    def _content(self) -> tuple:
+        return (type(self), self.annotation)
+
 
-@dataclass
+@dataclass(slots=True)
 class ArgumentPositionalOrKeyword(Argument):
     """Represents a positional-or-keyword argument."""
 
     position: int = field(kw_only=True)
     default: str = ""
 
-    @property
-    def type_name(self) -> str:
-        return "positional or keyword argument"
+    type_name: ClassVar[str] = "positional or keyword argument"
 
+    def _content(self) -> tuple:
+        return (type(self), self.annotation, self.position, self.default)
 
-@dataclass
+
+@dataclass(slots=True)
 class ArgumentPositionalOnly(Argument):
     """Represents a positional-only argument."""
 
     position: int = field(kw_only=True)
     default: str = ""
 
-    @property
-    def type_name(self) -> str:
-        return "positional-only argument"
+    type_name: ClassVar[str] = "positional-only argument"
+
+    def _content(self) -> tuple:
+        return (type(self), self.annotation, self.position, self.default)
 
 
-@dataclass
+@dataclass(slots=True)
 class ArgumentKeywordOnly(Argument):
     """Represents a keyword-only argument."""
 
     default: str = ""
 
-    @property
-    def type_name(self) -> str:
-        return "keyword-only argument"
+    type_name: ClassVar[str] = "keyword-only argument"
 
+    def _content(self) -> tuple:
+        return (type(self), self.annotation, self.default)
 
-@dataclass
+
+@dataclass(slots=True)
 class ArgumentVarPositional(Argument):
     """Represents a variable positional argument (e.g., *args)."""
 
-    @property
-    def type_name(self) -> str:
-        return "var positional argument"
+    type_name: ClassVar[str] = "var positional argument"
 
 
-@dataclass
+@dataclass(slots=True)
 class ArgumentVarKeyword(Argument):
     """Represents a variable keyword argument (e.g., **kwargs)."""
 
-    @property
-    def type_name(self) -> str:
-        return "var keyword argument"
+    type_name: ClassVar[str] = "var keyword argument"
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionMember(_AstApiMember):
     """Represents a function, parsed from a function definition."""
 
-    node: ast.FunctionDef | ast.AsyncFunctionDef = field(kw_only=True)
+    node: ast.FunctionDef | ast.AsyncFunctionDef = field(
+        kw_only=True, compare=False, repr=False
+    )
 
     arguments: dict[str, Argument] = field(init=False, default_factory=dict)
     returns: str = field(init=False)
     is_async: bool = field(init=False)
     decorators: list[str] = field(init=False, default_factory=list)
 
-    @property
-    def type_name(self) -> str:
-        return "function"
+    type_name: ClassVar[str] = "function"
 
     def __post_init__(self):
-        self.returns = ast.unparse(self.node.returns) if self.node.returns else ""
+        self.returns = _unparse(self.node.returns)
         self.is_async = isinstance(self.node, ast.AsyncFunctionDef)
-        self.decorators = [ast.unparse(expr) for expr in self.node.decorator_list]
+        self.decorators = [_unparse(expr) for expr in self.node.decorator_list]
         self._parse_arguments()
+        super(FunctionMember, self).__post_init__()
 
-    def _parse_arguments(self):
-        posonly = self.node.args.posonlyargs
-        args = self.node.args.args
-        defaults = self.node.args.defaults
-
-        padded_defaults = [None] * (len(posonly) + len(args) - len(defaults)) + defaults
+    def _content(self) -> tuple:
+        return (
+            type(self),
+            self.returns,
+            self.is_async,
+            tuple(self.decorators),
+            tuple((name, arg._hash) for name, arg in self.arguments.items()),
+        )
 
-        # Positional-only args
-        for i, (arg, default) in enumerate(
-            zip(posonly, padded_defaults[: len(posonly)])
-        ):
-            self.arguments[arg.arg] = ArgumentPositionalOnly(
-                path=self.path + [arg.arg],
-                position=i,
-                annotation=ast.unparse(arg.annotation) if arg.annotation else "",
-                default=ast.unparse(default) if default else "",
+    def _parse_arguments(self):
+        node_args = self.node.args
+        posonly_count = len(node_args.posonlyargs)
+        positional = node_args.posonlyargs + node_args.args
+        defaults = node_args.defaults
+        # Defaults belong to the last positional args
+        first_default = len(positional) - len(defaults)
+
+        # Positional-only, then positional or keyword args
+        for i, arg in enumerate(positional):
+            default = defaults[i - first_default] if i >= first_default else None
+            argument_type = (
+                ArgumentPositionalOnly
+                if i < posonly_count
+                else ArgumentPositionalOrKeyword
             )
-
-        # Positional or keyword args
-        for i, (arg, default) in enumerate(
-            zip(args, padded_defaults[len(posonly) :]), len(posonly)
-        ):
-            self.arguments[arg.arg] = ArgumentPositionalOrKeyword(
+            self.arguments[arg.arg] = argument_type(
                 path=self.path + [arg.arg],
                 position=i,
-                annotation=ast.unparse(arg.annotation) if arg.annotation else "",
-                default=ast.unparse(default) if default else "",
+                annotation=_unparse(arg.annotation),
+                default=_unparse(default),
             )
 
         # *args
-        if self.node.args.vararg:
-            arg = self.node.args.vararg
+        if node_args.vararg:
+            arg = node_args.vararg
             self.arguments[arg.arg] = ArgumentVarPositional(
                 path=self.path + [arg.arg],
-                annotation=ast.unparse(arg.annotation) if arg.annotation else "",
+                annotation=_unparse(arg.annotation),
             )
 
         # Keyword-only args
-        for arg, default in zip(self.node.args.kwonlyargs, self.node.args.kw_defaults):
+        for arg, default in zip(node_args.kwonlyargs, node_args.kw_defaults):
             self.arguments[arg.arg] = ArgumentKeywordOnly(
                 path=self.path + [arg.arg],
-                annotation=ast.unparse(arg.annotation) if arg.annotation else "",
-                default=ast.unparse(default) if default else "",
+                annotation=_unparse(arg.annotation),
+                default=_unparse(default),
             )
 
         # **kwargs
-        if self.node.args.kwarg:
-            arg = self.node.args.kwarg
+        if node_args.kwarg:
+            arg = node_args.kwarg
             self.arguments[arg.arg] = ArgumentVarKeyword(
                 path=self.path + [arg.arg],
-                annotation=ast.unparse(arg.annotation) if arg.annotation else "",
+                annotation=_unparse(arg.annotation),
             )
 
 
-@dataclass
-class NamespaceMember(_AstApiMember, ABC):
+@dataclass(slots=True)
+class NamespaceMember(_AstApiMember):
     """Represents a namespace (class or module) with nested members."""
 
-    check_name_fn: Callable[[str], bool] = field(default=lambda _: True)
+    node: ast.Module | ast.ClassDef = field(kw_only=True, compare=False, repr=False)
+    check_name_fn: Callable[[str], bool] = field(
+        default=_check_any_name, compare=False, repr=False
+    )
     members: dict[str, ApiMember] = field(init=False, default_factory=dict)
 
     def __post_init__(self):
-        for child in ast.iter_child_nodes(self.node):
-            if isinstance(child, ast.ClassDef):
-                name = child.name
-                if not self.check_name_fn(name):
-                    continue
-                self.members[name] = ClassMember(
-                    path=self.path + [name],
-                    node=child,
-                    check_name_fn=self.check_name_fn,
-                )
-            elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                name = child.name
-                if not self.check_name_fn(name):
-                    continue
-                self.members[name] = FunctionMember(path=self.path + [name], node=child)
-            elif isinstance(child, ast.AnnAssign):
-                name = ast.unparse(child.target)
-                if self.check_name_fn(name):
-                    self.members[name] = AttributeMember(
-                        path=self.path + [name], node=child
-                    )
-            elif isinstance(child, ast.Assign):
-                for target in child.targets:
-                    name = ast.unparse(target)
-                    if self.check_name_fn(name):
-                        self.members[name] = AttributeMember(
-                            path=self.path + [name], node=child
-                        )
-
-
-@dataclass
+        # Build nested classes from a worklist instead of recursing per class
+        namespaces: list[NamespaceMember] = []
+        stack: list[NamespaceMember] = [self]
+        while stack:
+            namespace = stack.pop()
+            namespaces.append(namespace)
+            stack.extend(namespace._parse_members())
+
+        # Each namespace was collected after its parent, so finalizing in
+        # reverse computes child hashes before the parents that roll them up
+        for namespace in reversed(namespaces):
+            namespace._finalize()
+
+    def _parse_members(self) -> list["ClassMember"]:
+        """Populate `members`, returning the nested classes still to populate."""
+        classes: list[ClassMember] = []
+        get_handler = _MEMBER_HANDLERS.get
+        # Members are only ever statements, so there's no need to visit a
+        # class's bases, keywords and decorators
+        for child in self.node.body:
+            handler = get_handler(type(child))
+            if handler is not None:
+                handler(self, child, classes)
+        return classes
+
+    def _finalize(self):
+        super(NamespaceMember, self).__post_init__()
+
+    def _content(self) -> tuple:
+        return (
+            type(self),
+            tuple((name, member._hash) for name, member in self.members.items()),
+        )
+
+
+@dataclass(slots=True)
 class ClassMember(NamespaceMember):
     """Represents a class definition."""
 
-    node: ast.ClassDef = field(kw_only=True)
+    node: ast.ClassDef = field(kw_only=True, compare=False, repr=False)
 
     bases: list[str] = field(init=False)
     decorators: list[str] = field(init=False)
 
-    @property
-    def type_name(self) -> str:
-        return "class"
+    type_name: ClassVar[str] = "class"
 
-    def __post_init__(self):
-        super().__post_init__()
-        self.bases = [ast.unparse(expr) for expr in self.node.bases]
-        self.decorators = [ast.unparse(expr) for expr in self.node.decorator_list]
+    def _finalize(self):
+        self.bases = [_unparse(expr) for expr in self.node.bases]
+        self.decorators = [_unparse(expr) for expr in self.node.decorator_list]
+        super(ClassMember, self)._finalize()
+
+    def _content(self) -> tuple:
+        return (
+            *super(ClassMember, self)._content(),
+            tuple(self.bases),
+            tuple(self.decorators),
+        )
 
 
-@dataclass
+@dataclass(slots=True)
 class ModuleMember(NamespaceMember):
     """Represents a module, the root of the AST tree."""
 
-    node: ast.Module = field(kw_only=True)
-    path: list[str] = field(init=False, default_factory=list)
-
-    @property
-    def type_name(self) -> str:
-        return "module"
+    node: ast.Module = field(kw_only=True, compare=False, repr=False)
+    path: list[str] = field(init=False, compare=False, default_factory=list)
+
+    type_name: ClassVar[str] = "module"
+
+
+def _parse_file(path: Path) -> ModuleMember:
+    """Parse a UTF-8 Python file into a module."""
+    return ModuleMember(node=ast.parse(path.read_text(encoding="utf-8")))
+
+
+def _parse_file_detached(path: Path) -> ModuleMember:
+    """Parse a file like `_parse_file`, leaving `node` unset on every member."""
+    module = _parse_file(path)
+    # The AST makes up most of a pickled module, and the parent process only
+    # needs the members, so workers drop it before sending the module back
+    stack: list[ApiMember] = [module]
+    while stack:
+        member = stack.pop()
+        if isinstance(member, _AstApiMember):
+            del member.node
+        if isinstance(member, NamespaceMember):
+            stack.extend(member.members.values())
+    return module
+
+
+def parse_modules(
+    paths: Sequence[Path], max_workers: int | None = None
+) -> dict[Path, ModuleMember]:
+    """
+    Parse many Python files into modules, using a pool of worker processes.
+
+    The modules are pickled back from the workers without their AST nodes, so
+    `node` is unset on every returned member.
+    """
+    workers = min(max_workers or os.cpu_count() or 1, len(paths)) or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        modules = executor.map(
+            _parse_file_detached, paths, chunksize=max(1, len(paths) // (4 * workers))
+        )
+        return dict(zip(paths, modules))
+
+
+def _target_name(target: ast.expr) -> str:
+    # Most assignment targets are bare names, which need no unparsing and are
+    # already interned by the parser
+    return target.id if type(target) is ast.Name else sys.intern(_unparse(target))
+
+
+def _add_class(
+    namespace: NamespaceMember, node: ast.ClassDef, classes: list[ClassMember]
+):
+    name = node.name
+    if not namespace.check_name_fn(name):
+        return
+    # Created without running `__post_init__`, since the worklist of the
+    # namespace being parsed populates and finalizes it
+    member = object.__new__(ClassMember)
+    member.path = namespace.path + [name]
+    member.node = node
+    member.check_name_fn = namespace.check_name_fn
+    member.members = {}
+    namespace.members[name] = member
+    classes.append(member)
+
+
+def _add_function(
+    namespace: NamespaceMember,
+    node: ast.FunctionDef | ast.AsyncFunctionDef,
+    classes: list[ClassMember],
+):
+    name = node.name
+    if namespace.check_name_fn(name):
+        namespace.members[name] = FunctionMember(
+            path=namespace.path + [name], node=node
+        )
+
+
+def _add_annotated_attribute(
+    namespace: NamespaceMember, node: ast.AnnAssign, classes: list[ClassMember]
+):
+    name = _target_name(node.target)
+    if namespace.check_name_fn(name):
+        namespace.members[name] = AttributeMember(
+            path=namespace.path + [name], node=node
+        )
+
+
+def _add_attributes(
+    namespace: NamespaceMember, node: ast.Assign, classes: list[ClassMember]
+):
+    check_name_fn = namespace.check_name_fn
+    members = namespace.members
+    path = namespace.path
+    member = None
+    for target in node.targets:
+        name = _target_name(target)
+        if not check_name_fn(name):
+            continue
+        if member is None:
+            member = AttributeMember(path=path + [name], node=node)
+        else:
+            # Targets of `a = b = ...` share one value, so reuse the first
+            # target's unparsed content and hash instead of computing them again
+            shared = member
+            member = object.__new__(AttributeMember)
+            member.path = path + [name]
+            member.node = node
+            member.annotation = shared.annotation
+            member.value = shared.value
+            member.parent_path = shared.parent_path
+            member.leaf_name = name
+            member._hash = shared._hash
+        members[name] = member
+
+
+# Member-producing statements, keyed by exact AST node type
+_MEMBER_HANDLERS: dict[
+    type[ast.AST], Callable[[NamespaceMember, Any, list[ClassMember]], None]
+] = {
+    ast.ClassDef: _add_class,
+    ast.FunctionDef: _add_function,
+    ast.AsyncFunctionDef: _add_function,
+    ast.AnnAssign: _add_annotated_attribute,
+    ast.Assign: _add_attributes,
+}
+
+
+def _set_field_names(cls: type[ApiMember]):
+    cls._field_names = frozenset(f.name for f in fields(cls)) | {"type_name"}
+    for subclass in cls.__subclasses__():
+        _set_field_names(subclass)
+
+
+# Fields are only known once the dataclass decorators have run, which is after
+# `__init_subclass__`, so the member classes get their keys here instead
+_set_field_names(ApiMember)
@@ -1,6 +1,10 @@
 from unittest import TestCase
+import ast
+import copy
+from dataclasses import fields
 import pathlib
 import sys
+from tempfile import TemporaryDirectory
 from textwrap import dedent
 
 sys.path.append(str(pathlib.Path(__file__).parent.parent.resolve()))
@@ -13,9 +17,13 @@ from difflog import (
     TypeChanged,
     RemovedClassBase,
     AddedClassBase,
+    ModifiedClassBase,
     RemovedDecorator,
     AddedDecorator,
     ModifiedDecorator,
+    AttributeMember,
+    ModuleMember,
+    parse_modules,
 )
 
 
@@ -304,3 +312,163 @@ class TestApiDiffing(TestCase):
                 )
             },
         )
+
+    def test_function_args_added(self):
+        script1 = dedent(
+            """
+            def foo(): pass
+        """
+        )
+
+        script2 = dedent(
+            """
+            def foo(a, *, b: int = 1): pass
+        """
+        )
+
+        self.assertEqual(
+            set(diff(script1, script2)),
+            {
+                Added(
+                    path="foo", name="a", type_name="positional or keyword argument"
+                ),
+                Added(path="foo", name="b", type_name="keyword-only argument"),
+            },
+        )
+
+    def test_class_bases_reordered(self):
+        script1 = dedent(
+            """
+            class Foo(A, B):
+                pass
+        """
+        )
+
+        script2 = dedent(
+            """
+            class Foo(B, A):
+                pass
+        """
+        )
+
+        self.assertEqual(
+            set(diff(script1, script2)),
+            {
+                ModifiedClassBase(
+                    path="", name="Foo", position=0, from_value="A", to_value="B"
+                ),
+                ModifiedClassBase(
+                    path="", name="Foo", position=1, from_value="B", to_value="A"
+                ),
+            },
+        )
+
+    def test_member_equality_ignores_node(self):
+        self.assertEqual(
+            ModuleMember(node=ast.parse("def foo(a: int) -> str: pass")),
+            ModuleMember(node=ast.parse("def foo(a: int) -> str: pass")),
+        )
+
+    def test_deeply_nested_classes(self):
+        script1 = dedent(
+            """
+            class A:
+                class B:
+                    x: int
+        """
+        )
+        script2 = script1.replace("int", "str")
+
+        module1 = ModuleMember(node=ast.parse(script1))
+        a = module1.members["A"]
+        b = a.members["B"]
+        self.assertEqual(b.parent_path, "A")
+        self.assertEqual(b.members["x"].parent_path, "A.B")
+        for member in (module1, a, b):
+            self.assertEqual(member._hash, hash(member._content()))
+
+        module2 = ModuleMember(node=ast.parse(script2))
+        self.assertNotEqual(module1._hash, module2._hash)
+        self.assertEqual(
+            set(diff(module1, module2)),
+            {
+                Modified(
+                    path="A.B",
+                    name="x",
+                    type_name="attribute",
+                    prop="annotation",
+                    from_value="int",
+                    to_value="str",
+                )
+            },
+        )
+
+    def test_chained_assignment(self):
+        module = ModuleMember(node=ast.parse("a = b = 1"))
+        b = module.members["b"]
+        built = AttributeMember(path=["b"], node=module.node.body[0])
+        for f in fields(AttributeMember):
+            self.assertEqual(getattr(b, f.name), getattr(built, f.name), f.name)
+
+        self.assertEqual(
+            set(diff("a = b = 1", "a = b = 2")),
+            {
+                Modified(
+                    path="",
+                    name=name,
+                    type_name="attribute",
+                    prop="value",
+                    from_value="1",
+                    to_value="2",
+                )
+                for name in ("a", "b")
+            },
+        )
+
+    def test_member_getitem(self):
+        module = ModuleMember(node=ast.parse("def foo(a: int) -> str: pass"))
+        foo = module["members"]["foo"]
+        self.assertEqual(foo["returns"], "str")
+        self.assertEqual(foo["type_name"], "function")
+        with self.assertRaises(KeyError):
+            foo["__class__"]
+
+    def test_diff_after_mutation(self):
+        old = ModuleMember(node=ast.parse("x = 1\ny = 2"))
+        new = ModuleMember(node=ast.parse("x = 1\ny = 2"))
+        del new.members["x"]
+        self.assertEqual(
+            set(diff(old, new)),
+            {Removed(path="", name="x", type_name="attribute")},
+        )
+
+    def test_sorted_changes(self):
+        self.assertEqual(
+            sorted(diff("class Foo:\n    y = 1\nx = 1", "z = 1")),
+            [
+                Removed(path="", name="Foo", type_name="class"),
+                Removed(path="", name="x", type_name="attribute"),
+                Added(path="", name="z", type_name="attribute"),
+            ],
+        )
+        x = Added(path="", name="x", type_name="attribute")
+        y = Removed(path="", name="y", type_name="attribute")
+        self.assertTrue(x <= x and x <= y and y > x and y >= y)
+
+    def test_parse_modules(self):
+        with TemporaryDirectory() as tmp:
+            old_file = pathlib.Path(tmp, "old.py")
+            new_file = pathlib.Path(tmp, "new.py")
+            old_file.write_text("def foo(a): pass")
+            new_file.write_text("def foo(a, b): pass")
+
+            modules = parse_modules([old_file, new_file], max_workers=2)
+
+        self.assertEqual(
+            set(diff(modules[old_file], modules[new_file])),
+            {Added(path="foo", name="b", type_name="positional or keyword argument")},
+        )
+        self.assertFalse(hasattr(modules[old_file], "node"))
+        # Only the modules sent back by workers drop their nodes
+        module = ModuleMember(node=ast.parse("x = 1"))
+        self.assertIsInstance(copy.deepcopy(module).node, ast.Module)